@@ -38,7 +38,7 @@ try:
         identify_watched_videos,
         find_similar_groups,
     )
-    from video_finder import config
+    from video_finder import config, hashing
 except ImportError as e:
     print(
         f"Fatal Error: Could not import video_finder modules. Ensure your environment is set up correctly."
@@ -165,7 +165,7 @@ def main():
     scan_dir, watched_dir = setup_test_directory()
 
     # --- 1. Test Hashing Performance ---
-    all_video_hashes = time_it(
+    all_video_hashes, _ = time_it(
         "Hashing all videos to scan",
         stats,
         calculate_all_hashes,
@@ -176,7 +176,7 @@ def main():
 
     # --- 2. Test Watched Video Identification Performance ---
     logging.info("Pre-calculating hashes for watched DB (not timed)...")
-    watched_video_hashes = calculate_all_hashes(
+    watched_video_hashes, _ = calculate_all_hashes(
         directory=watched_dir, num_frames=TEST_NUM_FRAMES, hash_size=TEST_HASH_SIZE
     )
 
@@ -190,7 +190,9 @@ def main():
         # First, structure the watched data into the correct format
         watched_videos_data_structured = defaultdict(set)
         for path, hashes in watched_video_hashes.items():
-            watched_videos_data_structured[path] = {str(h) for h in hashes}
+            watched_videos_data_structured[path] = set(
+                hashing.hashes_to_hex(hashes, TEST_HASH_SIZE)
+            )
 
         # Now, run the identification with the correctly structured data
         unwatched_hashes = time_it(
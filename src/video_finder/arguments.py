@@ -1,11 +1,54 @@
 import argparse
+import functools
 import logging
+import sys
 
 from . import config
 
 
-def parse_arguments():
-    """Parses command-line arguments for the video finder."""
+def _parse_number(value, cast):
+    """Converts `value` with `cast`, reporting failures like argparse's own int/float types."""
+    try:
+        return cast(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid {cast.__name__} value: {value!r}")
+
+
+def _percentage(value):
+    """argparse type: a float between 0 and 100."""
+    number = _parse_number(value, float)
+    if not 0 <= number <= 100:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 100, got {number}")
+    return number
+
+
+def _positive_int(value):
+    """argparse type: an integer greater than 0."""
+    number = _parse_number(value, int)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {number}")
+    return number
+
+
+def _non_negative_int(value):
+    """argparse type: an integer greater than or equal to 0."""
+    number = _parse_number(value, int)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"cannot be negative, got {number}")
+    return number
+
+
+def _hash_size(value):
+    """argparse type: an integer greater than 1."""
+    number = _parse_number(value, int)
+    if number <= 1:
+        raise argparse.ArgumentTypeError(f"must be greater than 1, got {number}")
+    return number
+
+
+@functools.cache
+def build_parser():
+    """Builds the command-line parser once; later calls return the same instance."""
     parser = argparse.ArgumentParser(
         description=(
             "Find similar/duplicate video files in a directory based on perceptual hashing (standard mode), "
@@ -40,21 +83,21 @@ def parse_arguments():
     core_group.add_argument(
         "-t",
         "--threshold",
-        type=float,
+        type=_percentage,
         default=config.DEFAULT_THRESHOLD,
         help="Similarity threshold percentage (0-100). Used in standard mode to find similar videos.",
     )
     core_group.add_argument(
         "-f",
         "--frames",
-        type=int,
+        type=_positive_int,
         default=config.NUM_FRAMES_TO_SAMPLE,
         help="Number of frames to sample per video for hashing.",
     )
     core_group.add_argument(
         "-s",
         "--hash-size",
-        type=int,
+        type=_hash_size,
         default=config.HASH_SIZE,
         help="Size of the perceptual hash grid (e.g., 8 for 8x8).",
     )
@@ -67,9 +110,9 @@ def parse_arguments():
     core_group.add_argument(
         "-w",
         "--workers",
-        type=int,
+        type=_positive_int,
         default=config.MAX_WORKERS,
-        help="Maximum number of worker threads for parallel processing.",
+        help="Maximum number of worker processes for parallel hashing.",
     )
     core_group.add_argument(
         "-r",
@@ -80,7 +123,7 @@ def parse_arguments():
     )
     core_group.add_argument(
         "--skip-duration",
-        type=int,
+        type=_non_negative_int,
         default=config.DEFAULT_SKIP_DURATION_SECONDS,
         help="Minimum video duration in seconds. Videos shorter than this will be skipped during hashing.",
     )
@@ -109,20 +152,68 @@ def parse_arguments():
         action="store_true",
         help="Enable verbose (DEBUG level) logging.",
     )
+    answer_group = general_group.add_mutually_exclusive_group()
+    answer_group.add_argument(
+        "-y",
+        "--assume-yes",
+        action="store_true",
+        help="Answer 'yes' to every confirmation prompt (non-interactive runs).",
+    )
+    answer_group.add_argument(
+        "--assume-no",
+        action="store_true",
+        help="Answer 'no' to every confirmation prompt (non-interactive runs).",
+    )
+
+    return parser
 
-    args = parser.parse_args()
 
-    # Argument validation
-    if not 0 <= args.threshold <= 100:
-        parser.error(f"Threshold must be between 0 and 100, got {args.threshold}")
-    if args.frames <= 0:
-        parser.error(f"Number of frames must be positive, got {args.frames}")
-    if args.hash_size <= 1:
-        parser.error(f"Hash size must be greater than 1, got {args.hash_size}")
-    if args.workers <= 0:
-        parser.error(f"Number of workers must be positive, got {args.workers}")
-    if args.skip_duration < 0:
-        parser.error(f"Skip duration cannot be negative, got {args.skip_duration}")
+@functools.lru_cache(maxsize=8)
+def _parse(argv):
+    """Parses an argv tuple. Cached, so repeated calls skip argparse."""
+    # Value constraints are enforced by the `type=` callables during parsing
+    return build_parser().parse_args(argv)
+
+
+def _default_namespace(directory):
+    """
+    Namespace for the plain `<directory>` invocation, built without argparse.
+    Must match the parser's defaults.
+    """
+    return argparse.Namespace(
+        directory=directory,
+        create_watched_source=None,
+        inspect_db=None,
+        threshold=config.DEFAULT_THRESHOLD,
+        frames=config.NUM_FRAMES_TO_SAMPLE,
+        hash_size=config.HASH_SIZE,
+        cache_file=config.DEFAULT_CACHE_FILENAME,
+        workers=config.MAX_WORKERS,
+        recursive=False,
+        skip_duration=config.DEFAULT_SKIP_DURATION_SECONDS,
+        watched_db=None,
+        verbose=False,
+        assume_yes=False,
+        assume_no=False,
+    )
+
+
+def parse_arguments(argv=None):
+    """
+    Parses command-line arguments for the video finder.
+
+    Args:
+        argv (list | None): Arguments to parse. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        argparse.Namespace: A fresh copy per call, so callers may modify it freely.
+    """
+    argv = tuple(sys.argv[1:] if argv is None else argv)
+    if len(argv) == 1 and not argv[0].startswith("-"):
+        # Fast path for the common `<directory>` invocation
+        args = _default_namespace(argv[0])
+    else:
+        args = argparse.Namespace(**vars(_parse(argv)))
 
     # Set logging level
     if args.verbose:
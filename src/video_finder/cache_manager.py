@@ -1,137 +1,198 @@
 import logging
 import os
-import shelve
+import sqlite3
+from contextlib import contextmanager
 
+import numpy as np
 
-def load_or_check_cache(video_files, cache_path, num_frames, hash_size):
+from . import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    num_frames INTEGER NOT NULL,
+    hash_size INTEGER NOT NULL,
+    hashes BLOB,
+    skipped INTEGER NOT NULL
+)
+"""
+
+
+@contextmanager
+def open_cache(cache_path):
     """
-    Loads cached hashes, checks for stale entries, and identifies files needing processing.
+    Opens (creating if needed) the SQLite hash cache for the duration of a `with`
+    block and closes it afterwards.
 
     Args:
-        video_files (list): List of absolute paths to video files found.
-        cache_path (str): Absolute path to the shelve cache file (without extension).
+        cache_path (str): Absolute path to the cache file (without extension).
+
+    Yields:
+        sqlite3.Connection | None: Open connection, or None if the cache is unusable.
+    """
+    cache_file = cache_path + config.CACHE_FILE_EXTENSION
+    logging.info(f"Using cache file: {cache_file}")
+
+    try:
+        cache_db = sqlite3.connect(cache_file)
+        for pragma, value in config.SQLITE_PRAGMAS.items():
+            cache_db.execute(f"PRAGMA {pragma}={value}")
+        cache_db.execute(_SCHEMA)
+        # Hashes from another hashing version are not comparable, so drop them all
+        # and let this run recalculate them
+        (hash_version,) = cache_db.execute("PRAGMA user_version").fetchone()
+        if hash_version != config.HASH_VERSION:
+            if cache_db.execute("SELECT 1 FROM hashes LIMIT 1").fetchone():
+                logging.info(
+                    f"Cache was built with hash version {hash_version}; "
+                    f"recalculating with version {config.HASH_VERSION}."
+                )
+                cache_db.execute("DELETE FROM hashes")
+            cache_db.execute(f"PRAGMA user_version={config.HASH_VERSION}")
+        cache_db.commit()
+    except sqlite3.Error as e:
+        logging.error(
+            f"Failed to open cache file {cache_file}: {e}. Proceeding without cache."
+        )
+        yield None
+        return
+
+    try:
+        yield cache_db
+    finally:
+        cache_db.close()
+
+
+def load_or_check_cache(video_files, cache_db, num_frames, hash_size):
+    """
+    Checks cached hashes for stale entries and identifies files needing processing.
+    Entries for files that no longer exist are deleted from the cache.
+
+    Args:
+        video_files (dict): {absolute video path: mtime} from `utils.get_video_files`.
+                            A plain list of paths is also accepted and stat'ed here.
+        cache_db (sqlite3.Connection | None): Connection yielded by `open_cache`.
         num_frames (int): Expected number of frames used for hashing.
         hash_size (int): Expected hash size used for hashing.
 
     Returns:
         tuple: (
-            dict: video_hashes - {video_path: [hash_obj, ...]},
+            dict: video_hashes - {video_path: np.ndarray of packed hashes},
             list: videos_to_process - [video_path, ...],
             set: cached_skipped_files - {video_path, ...},
-            dict: stats - {'hits': int, 'misses': int, 'stale': int, 'skipped': int}
+            dict: stats - {'hits': int, 'misses': int, 'stale': int, 'skipped': int, 'pruned': int}
         )
     """
     video_hashes = {}
     videos_to_process = []
     cached_skipped_files = set()
-    stats = {"hits": 0, "misses": 0, "stale": 0, "skipped": 0}
-    video_files_set = set(video_files)
-
-    logging.info(f"Using cache file: {cache_path}.db")
-
-    try:
-        with shelve.open(cache_path, flag="c") as cache:
-            # Remove cache entries for files that no longer exist
-            keys_to_delete = [k for k in cache if k not in video_files_set]
-            if keys_to_delete:
-                logging.info(
-                    f"Pruning {len(keys_to_delete)} non-existent files from cache..."
+    stats = {"hits": 0, "misses": 0, "stale": 0, "skipped": 0, "pruned": 0}
+
+    if not isinstance(video_files, dict):
+        # Fallback for callers without scan-time mtimes: one stat() per file
+        video_mtimes = {}
+        for video_path in video_files:
+            try:
+                video_mtimes[video_path] = os.path.getmtime(video_path)
+            except OSError:
+                logging.warning(f"File not found during cache check: {video_path}")
+        video_files = video_mtimes
+
+    cached_rows = {}
+    if cache_db is not None:
+        try:
+            cached_rows = {
+                row[0]: row[1:]
+                for row in cache_db.execute(
+                    "SELECT path, mtime, num_frames, hash_size, hashes, skipped FROM hashes"
                 )
-                deleted_count = 0
-                for key in keys_to_delete:
-                    try:
-                        del cache[key]
-                        deleted_count += 1
-                    except KeyError:
-                        logging.warning(
-                            f"Key {key} already removed from cache during pruning."
-                        )
-                    except Exception as e:
-                        logging.error(f"Error deleting key {key} from cache: {e}")
-                logging.info(
-                    f"Cache pruning complete ({deleted_count} entries removed)."
-                )
-
-            for video_path in video_files:
-                try:
-                    current_mtime = os.path.getmtime(video_path)
-                    if video_path in cache:
-                        cached_data = cache[video_path]
-                        is_stale = not (
-                            isinstance(cached_data, dict)
-                            and cached_data.get("mtime") == current_mtime
-                            and cached_data.get("num_frames") == num_frames
-                            and cached_data.get("hash_size") == hash_size
-                        )
-
-                        if is_stale:
-                            videos_to_process.append(video_path)
-                            stats["stale"] += 1
-                            logging.debug(
-                                f"Cache stale/invalid for: {os.path.basename(video_path)}"
-                            )
-                            continue
-
-                        # Entry is valid and not stale, check if it was skipped or hashed
-                        if cached_data.get("hashes") == "SKIPPED":
-                            cached_skipped_files.add(video_path)
-                            stats["skipped"] += 1
-                        elif isinstance(cached_data.get("hashes"), list):
-                            video_hashes[video_path] = cached_data["hashes"]
-                            stats["hits"] += 1
-                        else:
-                            videos_to_process.append(video_path)
-                            stats["stale"] += 1
-                    else:
-                        videos_to_process.append(video_path)
-                        stats["misses"] += 1
-
-                except FileNotFoundError:
-                    logging.warning(f"File not found during cache check: {video_path}")
-                    if video_path in cache:
-                        try:
-                            del cache[video_path]
-                            logging.info(
-                                f"Removed missing file {video_path} from cache."
-                            )
-                        except Exception as e:
-                            logging.error(
-                                f"Error removing missing file {video_path} from cache: {e}"
-                            )
-                except Exception as e:
-                    logging.error(f"Error checking cache for {video_path}: {e}")
-                    if video_path not in videos_to_process:
-                        videos_to_process.append(video_path)
-
-            logging.info(
-                f"Cache stats: Hits={stats['hits']}, Misses={stats['misses']}, Stale={stats['stale']}, Skipped={stats['skipped']}"
+            }
+
+            # Remove cache entries for files that no longer exist; the common
+            # "nothing removed" case costs one set difference and no writes
+            paths_to_delete = cached_rows.keys() - video_files.keys()
+            if paths_to_delete:
+                with cache_db:
+                    cache_db.executemany(
+                        "DELETE FROM hashes WHERE path = ?",
+                        ((video_path,) for video_path in paths_to_delete),
+                    )
+                stats["pruned"] = len(paths_to_delete)
+                logging.info(f"Pruned {stats['pruned']} non-existent files from cache.")
+        except sqlite3.Error as e:
+            logging.error(f"Failed to read cache: {e}. Proceeding without cache.")
+
+    # Checked once so the per-file debug message is only built when it will be shown
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    for video_path, current_mtime in video_files.items():
+        try:
+            cached_row = cached_rows.get(video_path)
+            if cached_row is None:
+                videos_to_process.append(video_path)
+                stats["misses"] += 1
+                continue
+
+            cached_mtime, cached_frames, cached_hash_size, cached_hashes, skipped = (
+                cached_row
+            )
+            is_stale = not (
+                cached_mtime == current_mtime
+                and cached_frames == num_frames
+                and cached_hash_size == hash_size
             )
 
-    except Exception as e:
-        logging.error(
-            f"Failed to open or process cache file {cache_path}.db: {e}. Proceeding without cache."
-        )
-        videos_to_process = list(video_files)
-        video_hashes = {}
-        cached_skipped_files = set()
-        stats = {"hits": 0, "misses": len(video_files), "stale": 0, "skipped": 0}
+            if is_stale:
+                videos_to_process.append(video_path)
+                stats["stale"] += 1
+                if debug_enabled:
+                    logging.debug(
+                        f"Cache stale/invalid for: {os.path.basename(video_path)}"
+                    )
+                continue
+
+            # Entry is valid and not stale, check if it was skipped or hashed
+            if skipped:
+                cached_skipped_files.add(video_path)
+                stats["skipped"] += 1
+            elif cached_hashes is not None:
+                video_hashes[video_path] = np.frombuffer(
+                    cached_hashes, dtype=np.uint64
+                ).reshape(num_frames, -1)
+                stats["hits"] += 1
+            else:
+                videos_to_process.append(video_path)
+                stats["stale"] += 1
+
+        except Exception as e:
+            logging.error(f"Error checking cache for {video_path}: {e}")
+            if video_path not in videos_to_process:
+                videos_to_process.append(video_path)
+
+    logging.info(
+        f"Cache stats: Hits={stats['hits']}, Misses={stats['misses']}, Stale={stats['stale']}, Skipped={stats['skipped']}"
+    )
 
     return video_hashes, videos_to_process, cached_skipped_files, stats
 
 
 def update_cache(
-    cache_path, newly_cached_hashes, newly_skipped_info, num_frames, hash_size
+    cache_db, newly_cached_hashes, newly_skipped_info, num_frames, hash_size
 ):
     """
-    Updates the cache file with newly calculated hashes and skipped video information.
+    Writes newly calculated hashes and skipped video information to the cache
+    in a single transaction.
 
     Args:
-        cache_path (str): Absolute path to the shelve cache file (without extension).
+        cache_db (sqlite3.Connection | None): Connection yielded by `open_cache`.
         newly_cached_hashes (dict): {video_path: {"hashes": ..., "mtime": ...}}.
         newly_skipped_info (dict): {video_path: {"mtime": ...}}.
         num_frames (int): The number of frames used for the hash calculation.
         hash_size (int): The hash size used for the calculation.
     """
+    if cache_db is None:
+        return
+
     if not newly_cached_hashes and not newly_skipped_info:
         logging.info("No new information to update in the cache.")
         return
@@ -139,34 +200,32 @@ def update_cache(
     logging.info(
         f"Updating cache with {len(newly_cached_hashes)} new hashes and {len(newly_skipped_info)} skipped files..."
     )
-    updated_count = 0
-    try:
-        with shelve.open(cache_path, flag="c") as cache:
-            # Update with new successful hashes
-            for video_path, data in newly_cached_hashes.items():
-                cache[video_path] = {
-                    "hashes": data["hashes"],
-                    "mtime": data["mtime"],
-                    "num_frames": num_frames,
-                    "hash_size": hash_size,
-                }
-                updated_count += 1
-
-            # Update with new skipped files
-            for video_path, data in newly_skipped_info.items():
-                cache[video_path] = {
-                    "hashes": "SKIPPED",
-                    "mtime": data["mtime"],
-                    "num_frames": num_frames,
-                    "hash_size": hash_size,
-                }
-                updated_count += 1
-
-        logging.info(f"Cache update complete ({updated_count} entries written).")
-    except Exception as e:
-        logging.error(
-            f"Failed to open or write to cache file {cache_path}.db for updates: {e}"
+
+    # Store hashes as the raw bytes of the packed uint64 array
+    rows = [
+        (
+            video_path,
+            data["mtime"],
+            num_frames,
+            hash_size,
+            np.ascontiguousarray(data["hashes"], dtype=np.uint64).tobytes(),
+            0,
         )
+        for video_path, data in newly_cached_hashes.items()
+    ]
+    rows.extend(
+        (video_path, data["mtime"], num_frames, hash_size, None, 1)
+        for video_path, data in newly_skipped_info.items()
+    )
+
+    try:
+        with cache_db:
+            cache_db.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        logging.info(f"Cache updated ({len(rows)} entries written).")
+    except sqlite3.Error as e:
+        logging.error(f"Failed to write cache: {e}")
 
 
 def get_cache_path(directory, cache_filename):
@@ -1,10 +1,31 @@
 import logging
 import sys
+import time
+
+from . import arguments
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that runs strftime once per second instead of once per record."""
+
+    _cached_time = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, cached_text = self._cached_time
+        if second != cached_second:
+            cached_text = time.strftime(
+                self.default_time_format, self.converter(record.created)
+            )
+            # Stored as one tuple so concurrent threads never see a mismatched pair
+            self._cached_time = (second, cached_text)
+        return self.default_msec_format % (cached_text, record.msecs)
 
-from . import arguments, modes
 
 # Set up logging to both console and file
-log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+log_formatter = _CachedTimeFormatter("%(asctime)s - %(levelname)s - %(message)s")
 
 # Console handler
 console_handler = logging.StreamHandler(sys.stdout)
@@ -14,7 +35,8 @@ console_handler.setFormatter(log_formatter)
 file_handler = logging.FileHandler("video_finder.log")
 file_handler.setFormatter(log_formatter)
 
-# Root logger
+# Root logger. Handlers write synchronously so log lines stay in order with
+# print()/input() prompts, and no logging thread is running when workers start
 root_logger = logging.getLogger()
 root_logger.setLevel(logging.INFO)
 root_logger.addHandler(console_handler)
@@ -25,6 +47,10 @@ def main():
     """Handle command-line arguments and run the selected video finder mode."""
     args = arguments.parse_arguments()
 
+    # Imported after parsing so --help and argument errors skip loading
+    # OpenCV/NumPy/SciPy; each mode's own imports load only when it runs
+    from . import modes
+
     if args.inspect_db:
         modes.run_inspect_db(args)
     elif args.create_watched_source:
@@ -35,7 +61,7 @@ def main():
         logging.error(
             "Error: No valid operation mode selected or required arguments missing."
         )
-        arguments.parser.print_help()
+        arguments.build_parser().print_help()
         sys.exit(1)
 
 
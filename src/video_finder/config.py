@@ -1,13 +1,52 @@
 import os
 
 VIDEO_EXTENSIONS = {".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"}
+# Same extensions for str.endswith() checks during directory scans
+VIDEO_EXTENSIONS_TUPLE = tuple(VIDEO_EXTENSIONS)
 NUM_FRAMES_TO_SAMPLE = 20
 HASH_SIZE = 8
-MAX_WORKERS = os.cpu_count()
+# Bumped whenever calculate_video_hashes produces different bits for the same frames.
+# Version 1 was the PIL/imagehash average hash; version 2 averages with OpenCV's
+# INTER_AREA resize, so hashes from the two are only close, not identical
+HASH_VERSION = 2
+# os.cpu_count() reports logical cores, and each worker already runs its own FFmpeg
+# decode threads (see FFMPEG_CAPTURE_OPTIONS), so more workers than this only adds
+# scheduler and cache contention
+MAX_WORKERS = min(8, os.cpu_count() or 4)
 DEFAULT_THRESHOLD = 90
 DEFAULT_SKIP_DURATION_SECONDS = 20
+# Sampled frames closer than this are reached with sequential grab() calls instead of a seek
+MAX_SEQUENTIAL_GRAB_FRAMES = 100
+# Passed to OpenCV's FFmpeg backend through OPENCV_FFMPEG_CAPTURE_OPTIONS
+FFMPEG_CAPTURE_OPTIONS = "threads;2"
+# Decoded frames buffered between the reader thread and the hashing loop
+FRAME_QUEUE_SIZE = 4
 DEFAULT_CACHE_FILENAME = ".video_hashes_cache"
+CACHE_FILE_EXTENSION = ".sqlite"
+# Applied to every hash cache connection: WAL with NORMAL sync (one fsync per
+# checkpoint), 64 MB page cache, in-memory temp tables and 256 MB of mmap I/O
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+}
+# Hashing tasks queued per worker process; further videos are submitted as these finish
+TASKS_IN_FLIGHT_PER_WORKER = 2
+# Hash results written to the cache per transaction while hashing is in progress
+CACHE_BATCH_SIZE = 128
 DEFAULT_DUPLICATE_DIR_NAME = "duplicate_videos"
 DEFAULT_WATCHED_DB_FILENAME = ".watched_videos"
 DEFAULT_WATCHED_DIR_NAME = "watched_videos"
 DEFAULT_SKIPPED_DIR_NAME = "skipped_videos"
+
+# The band filter gives up and falls back to the blocked scan once it would
+# enumerate more than this many pairs per video
+CANDIDATE_PAIRS_PER_ROW = 64
+# Below this many distinct hash rows the blocked scan beats the band filter's
+# bucketing overhead (crossover measured at a 97% threshold on 20-frame hashes)
+BAND_FILTER_MIN_ROWS = 12000
+BAND_FILTER_MIN_ROWS_WITHOUT_NUMBA = 400
+# Upper bound on uint64 elements in one XOR block during all-pairs comparison (~128 MB)
+PAIRWISE_BLOCK_ELEMENTS = 1 << 24
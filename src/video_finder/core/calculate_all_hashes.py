@@ -1,6 +1,9 @@
+import itertools
 import logging
+import logging.handlers
+import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 from .. import cache_manager, config, hashing, utils
 
@@ -13,6 +16,7 @@ def calculate_all_hashes(
     hash_size=config.HASH_SIZE,
     skip_duration=config.DEFAULT_SKIP_DURATION_SECONDS,
     max_workers=config.MAX_WORKERS,
+    cache_path=None,
 ):
     """
     Calculates or retrieves from cache the hashes for all valid video files
@@ -25,12 +29,15 @@ def calculate_all_hashes(
         num_frames (int): Number of frames to sample per video.
         hash_size (int): Size of the perceptual hash grid.
         skip_duration (int): Minimum video duration in seconds to process.
-        max_workers (int): Maximum number of threads for parallel processing.
+        max_workers (int): Maximum number of worker processes for parallel hashing.
+        cache_path (str, optional): Absolute cache path (without extension) already
+                                    resolved by the caller. Built from `directory`
+                                    and `cache_filename` if omitted.
 
     Returns:
         tuple: A tuple containing:
-            - dict: A dictionary mapping absolute video file paths to a list of their
-                    calculated hash objects.
+            - dict: A dictionary mapping absolute video file paths to their packed
+                    hash arrays (see `hashing.pack_hash_bits`).
             - set: A set of absolute paths for videos that were skipped during hashing.
     """
     logging.info(f"Scanning directory: {directory} (Recursive: {recursive})")
@@ -41,101 +48,153 @@ def calculate_all_hashes(
         logging.info("No video files found in the specified directory.")
         return {}, set()
 
-    # Load cache and determine which videos need processing
-    cache_path = cache_manager.get_cache_path(directory, cache_filename)
-    video_hashes, videos_to_process, cached_skipped_files, _ = (
-        cache_manager.load_or_check_cache(
-            video_files, cache_path, num_frames, hash_size
+    # Load cache and determine which videos need processing. The same connection
+    # is used for the final update and closed when the block exits.
+    if cache_path is None:
+        cache_path = cache_manager.get_cache_path(directory, cache_filename)
+    with cache_manager.open_cache(cache_path) as cache_db:
+        video_hashes, videos_to_process, cached_skipped_files, _ = (
+            cache_manager.load_or_check_cache(
+                video_files, cache_db, num_frames, hash_size
+            )
         )
-    )
 
-    processed_count = 0
-    newly_cached_hashes = {}
-    newly_skipped_info = {}
-
-    # Initialize with files that were marked as skipped in the cache
-    skipped_during_hashing = cached_skipped_files.copy()
-
-    if videos_to_process:
-        logging.info(
-            f"Calculating hashes for {len(videos_to_process)} videos using {max_workers} workers..."
-        )
-        futures = {}
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            for video_path in videos_to_process:
-                future = executor.submit(
-                    hashing.calculate_video_hashes,
-                    video_path,
-                    num_frames,
-                    hash_size,
-                    skip_duration,
-                )
-                futures[future] = video_path
-
-            for future in as_completed(futures):
-                processed_count += 1
-                video_path = futures[future]
-                try:
-                    hashes = future.result()
-                    current_mtime = os.path.getmtime(video_path)
-
-                    if hashes is not None and len(hashes) == num_frames:
-                        video_hashes[video_path] = hashes
-                        newly_cached_hashes[video_path] = {
-                            "hashes": hashes,
-                            "mtime": current_mtime,
-                            "num_frames": num_frames,
-                            "hash_size": hash_size,
-                        }
-                    else:
-                        # Hashing failed or was skipped, mark for caching as skipped
-                        skipped_during_hashing.add(video_path)
-                        newly_skipped_info[video_path] = {"mtime": current_mtime}
-                        if hashes is None:
-                            logging.warning(
-                                f"Failed to calculate hashes for {os.path.basename(video_path)} (returned None)."
-                            )
-                        elif not hashes:
-                            logging.info(
-                                f"Skipped hashing for {os.path.basename(video_path)}"
+        processed_count = 0
+        newly_cached_hashes = {}
+        newly_skipped_info = {}
+
+        # Initialize with files that were marked as skipped in the cache
+        skipped_during_hashing = cached_skipped_files.copy()
+
+        if videos_to_process:
+            logging.info(
+                f"Calculating hashes for {len(videos_to_process)} videos using {max_workers} workers..."
+            )
+            # Decoding and hashing are CPU-bound Python/NumPy work, so use processes
+            # rather than threads to sidestep the GIL. Workers return small packed arrays.
+            # Only a bounded window of futures is in flight, so huge scans do not
+            # create one Future (and one pickled task) per video up front
+            pending_videos = iter(videos_to_process)
+            in_flight = {}
+            # Workers are started without fork, so they inherit no locks or threads
+            # from this process, and send their log records back through a queue
+            mp_context = multiprocessing.get_context(
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            root_logger = logging.getLogger()
+            log_queue = mp_context.Queue()
+            log_listener = logging.handlers.QueueListener(
+                log_queue, *root_logger.handlers, respect_handler_level=True
+            )
+            log_listener.start()
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=mp_context,
+                    initializer=hashing.init_worker,
+                    initargs=(log_queue, root_logger.level),
+                ) as executor:
+
+                    def submit_next(count):
+                        for video_path in itertools.islice(pending_videos, count):
+                            future = executor.submit(
+                                hashing.calculate_video_hashes,
+                                video_path,
+                                num_frames,
+                                hash_size,
+                                skip_duration,
                             )
-                        else:
-                            logging.warning(
-                                f"Incorrect number/failed hash calculation for {os.path.basename(video_path)}. Skipping."
-                            )
-
-                except FileNotFoundError:
-                    logging.warning(
-                        f"File disappeared before processing completed: {video_path}"
-                    )
-                except Exception as e:
-                    logging.error(
-                        f"Exception processing {os.path.basename(video_path)}: {e}"
-                    )
-                    # Also mark as skipped if an unexpected exception occurs
-                    if video_path not in skipped_during_hashing:
-                        try:
-                            current_mtime = os.path.getmtime(video_path)
-                            skipped_during_hashing.add(video_path)
-                            newly_skipped_info[video_path] = {"mtime": current_mtime}
-                        except FileNotFoundError:
-                            logging.warning(
-                                f"File disappeared before it could be marked as skipped: {video_path}"
-                            )
-
-                if processed_count % 50 == 0 or processed_count == len(
-                    videos_to_process
-                ):
-                    logging.info(
-                        f"Processed {processed_count}/{len(videos_to_process)} videos for hashing."
-                    )
-    else:
-        logging.info("No new videos needed hash calculation (all loaded from cache).")
-
-    # Update cache after processing
-    if newly_cached_hashes or newly_skipped_info:
+                            in_flight[future] = video_path
+
+                    submit_next(max_workers * config.TASKS_IN_FLIGHT_PER_WORKER)
+                    while in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        submit_next(len(done))
+                        for future in done:
+                            processed_count += 1
+                            video_path = in_flight.pop(future)
+                            try:
+                                hashes = future.result()
+                                # mtime from the directory scan, so a file modified while it
+                                # was being hashed is re-hashed on the next run
+                                current_mtime = video_files[video_path]
+
+                                if hashes is not None and len(hashes) == num_frames:
+                                    video_hashes[video_path] = hashes
+                                    newly_cached_hashes[video_path] = {
+                                        "hashes": hashes,
+                                        "mtime": current_mtime,
+                                        "num_frames": num_frames,
+                                        "hash_size": hash_size,
+                                    }
+                                else:
+                                    # Hashing failed or was skipped, mark for caching as skipped
+                                    skipped_during_hashing.add(video_path)
+                                    newly_skipped_info[video_path] = {
+                                        "mtime": current_mtime
+                                    }
+                                    if hashes is None:
+                                        logging.warning(
+                                            f"Failed to calculate hashes for {os.path.basename(video_path)} (returned None)."
+                                        )
+                                    elif len(hashes) == 0:
+                                        logging.info(
+                                            f"Skipped hashing for {os.path.basename(video_path)}"
+                                        )
+                                    else:
+                                        logging.warning(
+                                            f"Incorrect number/failed hash calculation for {os.path.basename(video_path)}. Skipping."
+                                        )
+
+                            except FileNotFoundError:
+                                logging.warning(
+                                    f"File disappeared before processing completed: {video_path}"
+                                )
+                            except Exception as e:
+                                logging.error(
+                                    f"Exception processing {os.path.basename(video_path)}: {e}"
+                                )
+                                # Also mark as skipped if an unexpected exception occurs
+                                if video_path not in skipped_during_hashing:
+                                    skipped_during_hashing.add(video_path)
+                                    newly_skipped_info[video_path] = {
+                                        "mtime": video_files[video_path]
+                                    }
+
+                            # Commit results in batches so an interrupted run keeps its progress
+                            if (
+                                len(newly_cached_hashes) + len(newly_skipped_info)
+                                >= config.CACHE_BATCH_SIZE
+                            ):
+                                cache_manager.update_cache(
+                                    cache_db,
+                                    newly_cached_hashes,
+                                    newly_skipped_info,
+                                    num_frames,
+                                    hash_size,
+                                )
+                                newly_cached_hashes.clear()
+                                newly_skipped_info.clear()
+
+                            if processed_count % 50 == 0 or processed_count == len(
+                                videos_to_process
+                            ):
+                                logging.info(
+                                    f"Processed {processed_count}/{len(videos_to_process)} videos for hashing."
+                                )
+            finally:
+                # Workers have exited, so every record they sent is in the queue
+                log_listener.stop()
+        else:
+            logging.info(
+                "No new videos needed hash calculation (all loaded from cache)."
+            )
+
+        # Write whatever is left from the last partial batch
         cache_manager.update_cache(
-            cache_path, newly_cached_hashes, newly_skipped_info, num_frames, hash_size
+            cache_db, newly_cached_hashes, newly_skipped_info, num_frames, hash_size
         )
 
     logging.info(f"Total videos with valid hashes: {len(video_hashes)}")
@@ -1,9 +1,12 @@
+import itertools
 import logging
+import math
 import os
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-from .. import hashing, utils
-from ..utils.bktree import BKTree
+import numpy as np
+
+from .. import config, hashing, utils
 
 
 def find_similar_groups(video_hashes_map, hash_size, similarity_threshold):
@@ -11,7 +14,7 @@ def find_similar_groups(video_hashes_map, hash_size, similarity_threshold):
     Finds groups of similar videos based on their hashes.
 
     Args:
-        video_hashes_map (dict): {video_path: [hash_obj, ...]}. Typically contains
+        video_hashes_map (dict): {video_path: packed hash array}. Typically contains
                                  only unwatched videos if filtering was applied.
         hash_size (int): Size of the perceptual hash grid.
         similarity_threshold (float): Percentage (0-100). Pairs above this are similar.
@@ -30,58 +33,120 @@ def find_similar_groups(video_hashes_map, hash_size, similarity_threshold):
         )
         return []
 
-    total_comparisons = len(valid_videos) * (len(valid_videos) - 1) // 2
-    if total_comparisons == 0 and len(valid_videos) == 2:
-        total_comparisons = 1
-    elif total_comparisons == 0:
-        logging.info("No pairs to compare.")
-        return []
-
+    total_comparisons = math.comb(len(valid_videos), 2)
     logging.info(f"Comparing {total_comparisons} pairs...")
-    similar_pairs_with_scores = []
 
-    # Build reverse mapping from hash to videos
-    hash_to_video_map = defaultdict(list)
-    for video_path, hashes in video_hashes_map.items():
-        for h in hashes:
-            hash_to_video_map[h].append(video_path)
-
-    # Create and populate BK-Tree
-    bktree = BKTree(distance_func=lambda h1, h2: h1 - h2)
-    for h in hash_to_video_map:
-        bktree.add(h)
-
-    # Find candidate pairs through BK-Tree queries
-    candidate_pairs = set()
-    total_bits = hash_size * hash_size
-    max_avg_distance = total_bits * (1 - similarity_threshold / 100.0)
-    max_distance = int(max_avg_distance) + 1
-
-    for h, videos in hash_to_video_map.items():
-        results = bktree.query(h, max_distance)
-        for dist, found_hash in results:
-            matched_videos = hash_to_video_map.get(found_hash, [])
-            for v1 in videos:
-                for v2 in matched_videos:
-                    if v1 == v2:
-                        continue
-
-                    pair = tuple(sorted((v1, v2)))
-                    candidate_pairs.add(pair)
-
-    # Perform exact similarity check on candidate pairs
+    # Stack every video's packed hashes into one (N, num_frames * hash_words) matrix
+    hash_matrix = np.stack(
+        [video_hashes_map[video_path].reshape(-1) for video_path in valid_videos]
+    )
+    num_frames = len(video_hashes_map[valid_videos[0]])
+    hash_len_bits = hash_size * hash_size
+
+    # Videos with byte-identical hashes (e.g. exact copies) share one row, so only
+    # distinct rows are compared. Rows keep the order of their first video.
+    _, first_videos, row_of_video = np.unique(
+        hash_matrix, axis=0, return_index=True, return_inverse=True
+    )
+    row_order = np.argsort(first_videos)
+    hash_matrix = hash_matrix[first_videos[row_order]]
+    num_rows = len(hash_matrix)
+    videos_by_row = [[] for _ in range(num_rows)]
+    row_rank = np.empty(num_rows, dtype=np.intp)
+    row_rank[row_order] = np.arange(num_rows)
+    for video_idx, row in enumerate(row_rank[row_of_video.reshape(-1)].tolist()):
+        videos_by_row[row].append(valid_videos[video_idx])
+
     similar_pairs_with_scores = []
-    for video1, video2 in candidate_pairs:
-        hashes1 = video_hashes_map[video1]
-        hashes2 = video_hashes_map[video2]
+    # Checked once so the per-pair debug message is only built when it will be shown
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    def add_pair(row1, row2, similarity):
+        for video1 in videos_by_row[row1]:
+            for video2 in videos_by_row[row2]:
+                similar_pairs_with_scores.append((video1, video2, similarity))
+                if debug_enabled:
+                    logging.debug(
+                        f"Found similar pair: {os.path.basename(video1)} and {os.path.basename(video2)} (Similarity: {similarity:.2f}%)"
+                    )
+
+    identical_videos = 0
+    for row_videos in videos_by_row:
+        if len(row_videos) > 1:
+            identical_videos += len(row_videos)
+            for video1, video2 in itertools.combinations(row_videos, 2):
+                similar_pairs_with_scores.append((video1, video2, 100.0))
+    if identical_videos:
+        logging.info(
+            f"{identical_videos} videos share identical hashes; comparing {num_rows} distinct hash sets."
+        )
 
-        similarity = hashing.compare_hashes(hashes1, hashes2, hash_size=hash_size)
+    # Largest summed distance a pair may have and still reach the threshold
+    max_distance = int(
+        num_frames * hash_len_bits * (100 - similarity_threshold) / 100 + 1e-9
+    )
+    # Small libraries skip the filter; the Numba scan stays ahead for much longer
+    band_filter_min_rows = (
+        config.BAND_FILTER_MIN_ROWS
+        if hashing.numba is not None
+        else config.BAND_FILTER_MIN_ROWS_WITHOUT_NUMBA
+    )
+    candidate_pairs = None
+    if num_rows >= band_filter_min_rows:
+        candidate_pairs = utils.find_candidate_pairs(hash_matrix, max_distance)
+
+    if candidate_pairs is not None:
+        # Exact compare on the filtered candidates only, abandoning each pair once
+        # its partial distance already rules out the threshold
+        if candidate_pairs:
+            rows, cols = np.array(candidate_pairs).T
+            kept, distances = hashing.bounded_pair_distances(
+                hash_matrix, rows, cols, max_distance
+            )
+            # Every kept pair is within max_distance, so it meets the threshold
+            rows, cols = rows[kept], cols[kept]
+            similarities = (
+                (hash_len_bits - distances / num_frames) / hash_len_bits * 100
+            )
+            for row, col, similarity in zip(
+                rows.tolist(), cols.tolist(), similarities.tolist()
+            ):
+                add_pair(row, col, similarity)
+    else:
+        # NumPy releases the GIL inside the XOR/popcount ufuncs, so row blocks run on
+        # threads without copying the matrix. The Numba kernel is already multi-core
+        # and stays on the calling thread.
+        max_workers = 1 if hashing.numba is not None else os.cpu_count() or 1
+
+        # Broadcast XOR over blocks of rows to bound the size of the temporary tensors
+        rows_per_block = max(
+            1,
+            config.PAIRWISE_BLOCK_ELEMENTS
+            // (max_workers * num_rows * hash_matrix.shape[1]),
+        )
 
-        if similarity >= similarity_threshold:
-            similar_pairs_with_scores.append((video1, video2, similarity))
-            logging.debug(
-                f"Found similar pair: {os.path.basename(video1)} and {os.path.basename(video2)} (Similarity: {similarity:.2f}%)"
+        def compare_block(start):
+            stop = min(start + rows_per_block, num_rows)
+            distances = hashing.block_distances(hash_matrix, start, stop, max_distance)
+            # Only keep the strict upper triangle so each pair is reported once, and
+            # only convert the kept distances to similarities
+            rows, cols = np.nonzero(np.triu(distances <= max_distance, k=1))
+            similarities = (
+                (hash_len_bits - distances[rows, cols] / num_frames)
+                / hash_len_bits
+                * 100
             )
+            return start, rows, cols, similarities
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            block_map = map if max_workers == 1 else executor.map
+            for start, rows, cols, scores in block_map(
+                compare_block, range(0, num_rows, rows_per_block)
+            ):
+                for row, col, similarity in zip(
+                    rows.tolist(), cols.tolist(), scores.tolist()
+                ):
+                    add_pair(start + row, start + col, similarity)
 
     logging.info(
         f"Found {len(similar_pairs_with_scores)} similar pairs above {similarity_threshold}% threshold."
@@ -1,8 +1,9 @@
 import logging
 import os
-import imagehash
 
-from ..utils.bktree import BKTree
+import numpy as np
+
+from .. import hashing
 
 
 def identify_watched_videos(
@@ -12,7 +13,7 @@ def identify_watched_videos(
     Identifies videos whose hashes match any hash stored in the watched data.
 
     Args:
-        video_hashes_map (dict): {video_path: [hash_obj, ...]}.
+        video_hashes_map (dict): {video_path: packed hash array}.
         watched_videos_data (dict): {video_identifier: {hash_set_str}}.
         hash_size (int): Size of the perceptual hash grid (used for comparison).
         similarity_threshold (float): Percentage (0-100).
@@ -20,12 +21,11 @@ def identify_watched_videos(
     Returns:
         tuple: (
             list: watched_paths_list - Absolute paths of videos considered watched.
-            dict: unwatched_hashes_dict - {video_path: [hash_obj, ...]} for non-watched videos.
+            dict: unwatched_hashes_dict - {video_path: packed hash array} for non-watched videos.
         )
     """
     watched_paths = []
     unwatched_hashes = {}
-    count = 0
     total = len(video_hashes_map)
 
     if not watched_videos_data:
@@ -43,21 +43,13 @@ def identify_watched_videos(
         )
         return [], video_hashes_map
 
-    # Convert string hashes to ImageHash objects and build BK-Tree
+    # Parse hex string hashes into one packed array, compared in bulk below
     try:
-        watched_hashes_obj_set = {
-            imagehash.hex_to_hash(h_str) for h_str in all_watched_hashes_str
-        }
+        watched_hashes = hashing.hex_to_hashes(all_watched_hashes_str, hash_size)
         logging.info(
-            f"Successfully converted {len(watched_hashes_obj_set)} unique watched hashes from strings to objects."
+            f"Successfully converted {len(watched_hashes)} unique watched hashes from strings to packed arrays."
         )
 
-        # Build BK-Tree with Hamming distance metric
-        watched_bktree = BKTree(distance_func=lambda h1, h2: h1 - h2)
-        for h in watched_hashes_obj_set:
-            watched_bktree.add(h)
-        logging.info("Built BK-Tree for efficient hash searching")
-
     except Exception as e:
         logging.error(
             f"Error initializing watched hashes: {e}. Skipping video identification.",
@@ -66,60 +58,66 @@ def identify_watched_videos(
         return [], video_hashes_map
 
     logging.info(
-        f"Analyzing {total} videos using BK-Tree with {len(watched_hashes_obj_set)} hashes..."
+        f"Analyzing {total} videos against {len(watched_hashes)} watched hashes..."
     )
 
-    for video_path, hashes_list in video_hashes_map.items():
-        count += 1
-        if not hashes_list:
-            continue
-
-        best_match_distances = []
-        hash_len_bits = hash_size * hash_size
-
-        for video_hash in hashes_list:
-            if not isinstance(video_hash, imagehash.ImageHash):
-                logging.warning(
-                    f"Skipping non-ImageHash object found for video {video_path}"
-                )
-                continue
-
-            # BK-Tree nearest neighbor search
-            min_dist = hash_len_bits  # Init with max possible distance
-            if watched_bktree.root is not None:
-                queue = [watched_bktree.root]
-                while queue:
-                    node = queue.pop(0)
-                    current_dist = watched_bktree.distance_func(video_hash, node.item)
-                    if current_dist < min_dist:
-                        min_dist = current_dist
-
-                    # Explore children that could have closer matches
-                    lower_bound = current_dist - min_dist
-                    upper_bound = current_dist + min_dist
-                    for d in list(node.children.keys()):
-                        if lower_bound <= d <= upper_bound:
-                            queue.append(node.children[d])
-
-            best_match_distances.append(min_dist)
-
-        if not best_match_distances:
-            continue
-
-        # Calculate overall similarity
-        avg_distance = sum(best_match_distances) / len(best_match_distances)
-        similarity = max(0.0, (hash_len_bits - avg_distance) / hash_len_bits) * 100
-
-        if similarity >= similarity_threshold:
+    videos_to_check = [
+        (video_path, hashes_list)
+        for video_path, hashes_list in video_hashes_map.items()
+        if hashes_list is not None and len(hashes_list) > 0
+    ]
+    if not videos_to_check:
+        logging.info("Identified 0 watched videos.")
+        return watched_paths, unwatched_hashes
+
+    # Distance from every frame of every video to its nearest watched hash, in one
+    # blocked XOR + popcount pass over all frames at once
+    frame_counts = np.array([len(hashes_list) for _, hashes_list in videos_to_check])
+    all_frames = np.concatenate([hashes_list for _, hashes_list in videos_to_check])
+
+    # Frames stored verbatim in the watched DB (e.g. re-scanned watched files) are
+    # at distance 0; a sorted membership test settles them without the XOR pass
+    row_type = np.dtype((np.void, all_frames.shape[1] * all_frames.itemsize))
+    exact_matches = np.isin(
+        np.ascontiguousarray(all_frames).view(row_type).ravel(),
+        np.ascontiguousarray(watched_hashes).view(row_type).ravel(),
+    )
+    frame_distances = np.zeros(len(all_frames), dtype=np.uint32)
+    if not exact_matches.all():
+        frame_distances[~exact_matches] = hashing.min_distances(
+            all_frames[~exact_matches], watched_hashes
+        )
+    first_frames = np.cumsum(frame_counts) - frame_counts
+    total_distances = np.add.reduceat(frame_distances, first_frames, dtype=np.uint64)
+
+    # Largest summed distance each video may have and still reach the threshold,
+    # so videos are classified with integer compares
+    hash_len_bits = hash_size * hash_size
+    max_distances = (
+        frame_counts * hash_len_bits * (100 - similarity_threshold) / 100 + 1e-9
+    ).astype(np.uint64)
+    is_watched = total_distances <= max_distances
+
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    for (video_path, hashes_list), watched, total_distance, num_frames in zip(
+        videos_to_check,
+        is_watched.tolist(),
+        total_distances.tolist(),
+        frame_counts.tolist(),
+    ):
+        if watched:
             watched_paths.append(video_path)
-            logging.debug(
-                f"Video '{os.path.basename(video_path)}' matched watched (Similarity: {similarity:.2f}%)"
-            )
+            if debug_enabled:
+                avg_distance = total_distance / num_frames
+                similarity = (hash_len_bits - avg_distance) / hash_len_bits * 100
+                logging.debug(
+                    f"Video '{os.path.basename(video_path)}' matched watched (Similarity: {similarity:.2f}%)"
+                )
         else:
             unwatched_hashes[video_path] = hashes_list
 
-        if count % 100 == 0 or count == total:
-            logging.info(f"Checked {count}/{total} videos against watched database.")
-
+    logging.info(
+        f"Checked {len(videos_to_check)}/{total} videos against watched database."
+    )
     logging.info(f"Identified {len(watched_paths)} watched videos.")
     return watched_paths, unwatched_hashes
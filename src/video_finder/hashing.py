@@ -1,12 +1,305 @@
 import logging
+import logging.handlers
 import cv2
-import imagehash
 import numpy as np
-from PIL import Image
 import os
+import queue
+import threading
 
 from . import config  # Relative import
 
+try:
+    import numba
+except ImportError:  # Optional, installed with the "fast" extra
+    numba = None
+
+# NumPy >= 2.0 exposes a vectorized popcount that compiles down to POPCNT.
+_bitwise_count = getattr(np, "bitwise_count", None)
+# Set-bit count of every byte value, for the fallback on older NumPy
+_BYTE_POPCOUNT = np.array([i.bit_count() for i in range(256)], dtype=np.uint8)
+
+# Read by OpenCV's FFmpeg backend whenever a capture is opened; a value set by
+# the user in the environment takes precedence.
+os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", config.FFMPEG_CAPTURE_OPTIONS)
+
+
+def pack_hash_bits(bits):
+    """
+    Packs per-frame hash bits into a uint64 array.
+
+    Each frame's bits are zero-padded to a multiple of 64 and packed big-endian,
+    so an 8x8 hash occupies exactly one uint64.
+
+    Args:
+        bits (np.ndarray): Boolean array of shape (num_frames, hash_size * hash_size).
+
+    Returns:
+        np.ndarray: Array of shape (num_frames, hash_words) and dtype uint64.
+    """
+    num_hashes, num_bits = bits.shape
+    padded = np.zeros((num_hashes, -(-num_bits // 64) * 64), dtype=bool)
+    padded[:, :num_bits] = bits
+    return np.packbits(padded, axis=1).view(">u8").astype(np.uint64)
+
+
+def hash_to_int(packed_hash, hash_size):
+    """Converts one packed frame hash into the integer value of its hash bits."""
+    padding = packed_hash.size * 64 - hash_size * hash_size
+    return (
+        int.from_bytes(np.asarray(packed_hash, dtype=">u8").tobytes(), "big") >> padding
+    )
+
+
+def hash_to_hex(packed_hash, hash_size):
+    """Formats one packed frame hash as a hex string (same format as imagehash's str())."""
+    width = -(-hash_size * hash_size // 4)
+    return f"{hash_to_int(packed_hash, hash_size):0{width}x}"
+
+
+def hashes_to_hex(packed_hashes, hash_size):
+    """
+    Formats every frame hash of a packed array as a hex string (see `hash_to_hex`)
+    with one bytes.hex() call over the whole array.
+    """
+    num_bits = hash_size * hash_size
+    if num_bits % 4:
+        # Padding does not end on a hex digit boundary, format frame by frame
+        return [hash_to_hex(packed_hash, hash_size) for packed_hash in packed_hashes]
+    packed_hashes = np.asarray(packed_hashes, dtype=">u8")
+    frame_width = packed_hashes.shape[1] * 16
+    all_hex = packed_hashes.tobytes().hex()
+    # The zero padding sits in the trailing hex digits of each frame
+    return [
+        all_hex[start : start + num_bits // 4]
+        for start in range(0, len(all_hex), frame_width)
+    ]
+
+
+def hex_to_hashes(hex_hashes, hash_size):
+    """
+    Parses hex hash strings (see `hash_to_hex`) back into a packed uint64 array
+    of shape (len(hex_hashes), hash_words).
+    """
+    num_bits = hash_size * hash_size
+    hash_words = -(-num_bits // 64)
+    padding = hash_words * 64 - num_bits
+    packed_bytes = b"".join(
+        (int(hex_hash, 16) << padding).to_bytes(hash_words * 8, "big")
+        for hex_hash in hex_hashes
+    )
+    return (
+        np.frombuffer(packed_bytes, dtype=">u8")
+        .astype(np.uint64)
+        .reshape(-1, hash_words)
+    )
+
+
+def popcount64(values):
+    """Returns the number of set bits of every element of a uint64 array."""
+    if _bitwise_count is not None:
+        return _bitwise_count(values)
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    byte_counts = _BYTE_POPCOUNT[values.view(np.uint8)]
+    return byte_counts.reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+if numba is not None:
+
+    # Returns int64 so the kernels' int64 accumulators stay integer; adding a uint64
+    # to an int64 would promote the running total to float64
+    @numba.njit(inline="always")
+    def _popcount64_scalar(x):
+        x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) + (
+            (x >> np.uint64(2)) & np.uint64(0x3333333333333333)
+        )
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return np.int64((x * np.uint64(0x0101010101010101)) >> np.uint64(56))
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _block_distances_numba(hash_matrix, start, stop, max_distance):
+        num_rows, num_words = hash_matrix.shape
+        distances = np.zeros((stop - start, num_rows - start), dtype=np.uint32)
+        for row in numba.prange(stop - start):
+            i = start + row
+            # Only the strict upper triangle is needed, the rest stays zero
+            for col in range(row + 1, num_rows - start):
+                j = start + col
+                total = 0
+                for k in range(num_words):
+                    total += _popcount64_scalar(hash_matrix[i, k] ^ hash_matrix[j, k])
+                    # The exact value no longer matters once the bound is exceeded
+                    if total > max_distance:
+                        break
+                distances[row, col] = total
+        return distances
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _min_distances_numba(query_hashes, reference_hashes):
+        num_references, num_words = reference_hashes.shape
+        distances = np.empty(query_hashes.shape[0], dtype=np.uint32)
+        for i in numba.prange(query_hashes.shape[0]):
+            best = num_words * 64
+            for j in range(num_references):
+                total = 0
+                for k in range(num_words):
+                    total += _popcount64_scalar(
+                        query_hashes[i, k] ^ reference_hashes[j, k]
+                    )
+                    # Cannot beat the closest reference found so far
+                    if total >= best:
+                        break
+                if total < best:
+                    best = total
+            distances[i] = best
+        return distances
+
+
+def block_distances(hash_matrix, start, stop, max_distance):
+    """
+    Computes Hamming distances between rows `start:stop` and rows `start:` of a
+    packed hash matrix, without materializing the XOR tensor when Numba is available.
+
+    Args:
+        hash_matrix (np.ndarray): uint64 array of shape (num_videos, hash_words_total).
+        start (int): First row of the block.
+        stop (int): One past the last row of the block.
+        max_distance (int): Largest distance the caller needs exactly. The Numba kernel
+                            stops summing a pair once it is exceeded.
+
+    Returns:
+        np.ndarray: uint32 array of shape (stop - start, num_videos - start).
+                    Only the strict upper triangle is guaranteed to be filled, and
+                    entries above `max_distance` are only guaranteed to stay above it.
+    """
+    if numba is not None:
+        return _block_distances_numba(hash_matrix, start, stop, max_distance)
+    xor = hash_matrix[start:stop, None, :] ^ hash_matrix[None, start:, :]
+    return popcount64(xor).sum(axis=-1, dtype=np.uint32)
+
+
+def bounded_pair_distances(hash_matrix, rows, cols, max_distance, num_steps=4):
+    """
+    Computes Hamming distances between the row pairs `(rows[i], cols[i])` of a packed
+    hash matrix, dropping pairs as soon as their running distance exceeds `max_distance`.
+
+    Columns are compared in `num_steps` slices, so pairs that are clearly too far
+    apart are discarded after the first slices instead of being compared in full.
+
+    Args:
+        hash_matrix (np.ndarray): uint64 array of shape (num_rows, hash_words_total).
+        rows (np.ndarray): First row of each pair.
+        cols (np.ndarray): Second row of each pair.
+        max_distance (int): Largest total Hamming distance a kept pair may have.
+        num_steps (int): Number of column slices to accumulate the distance over.
+
+    Returns:
+        tuple: (np.ndarray of indices into `rows`/`cols` of the kept pairs,
+                np.ndarray of their uint32 distances)
+    """
+    num_words = hash_matrix.shape[1]
+    step = -(-num_words // num_steps)
+    kept = np.arange(len(rows))
+    distances = np.zeros(len(rows), dtype=np.uint32)
+    for start in range(0, num_words, step):
+        words = slice(start, start + step)
+        xor = hash_matrix[rows[kept], words] ^ hash_matrix[cols[kept], words]
+        distances[kept] += popcount64(xor).sum(axis=-1, dtype=np.uint32)
+        kept = kept[distances[kept] <= max_distance]
+        if not len(kept):
+            break
+    return kept, distances[kept]
+
+
+def min_distances(query_hashes, reference_hashes):
+    """
+    Computes, for every packed frame hash in `query_hashes`, the Hamming distance
+    to its nearest hash in `reference_hashes`.
+
+    Uses a parallel Numba kernel when available. Otherwise query rows are processed
+    in blocks so the XOR tensor stays within `config.PAIRWISE_BLOCK_ELEMENTS` elements.
+
+    Args:
+        query_hashes (np.ndarray): uint64 array of shape (num_queries, hash_words).
+        reference_hashes (np.ndarray): uint64 array of shape (num_references, hash_words).
+
+    Returns:
+        np.ndarray: uint32 array of shape (num_queries,).
+    """
+    if numba is not None:
+        return _min_distances_numba(
+            np.ascontiguousarray(query_hashes), np.ascontiguousarray(reference_hashes)
+        )
+    num_references, hash_words = reference_hashes.shape
+    block_rows = max(1, config.PAIRWISE_BLOCK_ELEMENTS // (num_references * hash_words))
+    distances = np.empty(len(query_hashes), dtype=np.uint32)
+    for start in range(0, len(query_hashes), block_rows):
+        xor = (
+            query_hashes[start : start + block_rows, None, :]
+            ^ reference_hashes[None, :, :]
+        )
+        distances[start : start + block_rows] = (
+            popcount64(xor).sum(axis=-1, dtype=np.uint32).min(axis=1)
+        )
+    return distances
+
+
+def init_worker(log_queue, log_level):
+    """
+    Initializes a hashing worker process. OpenCV otherwise starts one thread per
+    core in every worker, oversubscribing the CPU when the pool already has one
+    process per core. Decoding still uses FFmpeg's own threads.
+
+    Log records are sent to `log_queue` and written by the parent's handlers, since
+    a spawned worker has no handlers of its own (or, if it re-ran the CLI module,
+    its own copies of them).
+
+    Args:
+        log_queue (multiprocessing.Queue): Queue drained by the parent's QueueListener.
+        log_level (int): Level of the parent's root logger.
+    """
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        handler.close()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(log_level)
+    cv2.setNumThreads(1)
+
+
+def _read_sampled_frames(cap, indices, frame_queue, stop_reading, video_path):
+    """
+    Decodes the frames at `indices` and puts `(frame_idx, frame)` on `frame_queue`
+    (frame is None if it could not be read), followed by a None sentinel.
+    """
+    try:
+        # Index of the frame the next grab()/read() will return
+        position = 0
+        for frame_idx in indices:
+            if stop_reading.is_set():
+                break
+            # Seeking makes FFmpeg decode forward from the previous keyframe, so for
+            # nearby samples it is cheaper to keep decoding sequentially with grab(),
+            # which skips the frame conversion done by read().
+            gap = frame_idx - position
+            if gap < 0 or gap > config.MAX_SEQUENTIAL_GRAB_FRAMES:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                position = frame_idx
+            while position < frame_idx and cap.grab():
+                position += 1
+
+            frame = None
+            if position == frame_idx:
+                ret, frame = cap.read()
+                position += 1
+                if not ret:
+                    frame = None
+            frame_queue.put((frame_idx, frame))
+    except Exception as e:
+        logging.error(f"Error decoding frames from {video_path}: {e}")
+    finally:
+        frame_queue.put(None)
+
 
 def calculate_video_hashes(
     video_path,
@@ -16,7 +309,8 @@ def calculate_video_hashes(
 ):
     """
     Extracts frames from a video and calculates their average hashes.
-    Returns a list of imagehash objects or None if an error occurs.
+    Returns a uint64 array of shape (num_frames, hash_words) (see `pack_hash_bits`),
+    an empty list if the video was skipped, or None if an error occurs.
     """
     cap = None
     try:
@@ -54,18 +348,39 @@ def calculate_video_hashes(
         frame_hashes = []
         indices = np.linspace(0, max(0, total_frames - 1), num_frames, dtype=int)
 
-        for frame_idx in indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-            ret, frame = cap.read()
-            if ret:
-                resized_frame = cv2.resize(
-                    frame, (32, 32), interpolation=cv2.INTER_AREA
+        # Decode on a reader thread while this thread hashes; OpenCV releases the
+        # GIL in both, and the bounded queue caps how many frames are held at once
+        frame_queue = queue.Queue(maxsize=config.FRAME_QUEUE_SIZE)
+        stop_reading = threading.Event()
+        reader = threading.Thread(
+            target=_read_sampled_frames,
+            args=(cap, indices, frame_queue, stop_reading, video_path),
+            daemon=True,
+        )
+        reader.start()
+        try:
+            while (item := frame_queue.get()) is not None:
+                frame_idx, frame = item
+                if frame is None:
+                    logging.warning(
+                        f"Could not read frame {frame_idx} from {video_path}"
+                    )
+                    continue
+                # Average hash computed directly on the BGR frame: shrink to the
+                # hash grid, convert to grayscale and threshold against the mean
+                small = cv2.resize(
+                    frame, (hash_size, hash_size), interpolation=cv2.INTER_AREA
                 )
-                img = Image.fromarray(cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB))
-                h = imagehash.average_hash(img, hash_size=hash_size)
-                frame_hashes.append(h)
-            else:
-                logging.warning(f"Could not read frame {frame_idx} from {video_path}")
+                gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+                frame_hashes.append((gray > gray.mean()).flatten())
+        finally:
+            # Unblock the reader if hashing stopped early, before releasing `cap`
+            stop_reading.set()
+            while reader.is_alive():
+                try:
+                    frame_queue.get_nowait()
+                except queue.Empty:
+                    reader.join(0.01)
 
         cap.release()
 
@@ -79,53 +394,10 @@ def calculate_video_hashes(
             )
             return None
 
-        return frame_hashes
+        return pack_hash_bits(np.stack(frame_hashes))
 
     except Exception as e:
         logging.error(f"Error processing video {video_path}: {e}")
         if cap is not None and cap.isOpened():
             cap.release()
         return None
-
-
-def compare_hashes(hashes1, hashes2, hash_size=config.HASH_SIZE):
-    """
-    Compares two lists of hashes. Returns a similarity percentage.
-    """
-    if not hashes1 or not hashes2 or len(hashes1) != len(hashes2):
-        if hashes1 and hashes2:
-            logging.warning(
-                f"Hash list length mismatch during comparison: {len(hashes1)} vs {len(hashes2)}"
-            )
-        return 0.0
-
-    total_distance = 0
-    num_hashes = len(hashes1)
-    hash_len_bits = hash_size * hash_size
-
-    for i, (h1, h2) in enumerate(zip(hashes1, hashes2)):
-        try:
-            if h1 is None or h2 is None:
-                logging.warning(
-                    f"Invalid hash object (None) encountered during comparison at index {i}."
-                )
-                distance = hash_len_bits
-            else:
-                distance = h1 - h2
-            total_distance += distance
-        except TypeError as e:
-            logging.warning(
-                f"TypeError during hash comparison at index {i}: {e}. Hashes: {h1}, {h2}"
-            )
-            total_distance += hash_len_bits
-        except Exception as e:
-            logging.error(f"Unexpected error during hash comparison at index {i}: {e}")
-            total_distance += hash_len_bits
-
-    if num_hashes == 0 or hash_len_bits == 0:
-        logging.error("Invalid hash or frame count, cannot calculate similarity.")
-        return 0.0
-
-    average_distance = total_distance / num_hashes
-    similarity = max(0.0, (hash_len_bits - average_distance) / hash_len_bits) * 100
-    return similarity
@@ -1,9 +1,21 @@
-from .create_watched_db import run_create_watched_db
-from .find_similar import run_find_similar
-from .inspect_db import run_inspect_db
+import importlib
+
+# Each mode is imported on first use, so e.g. --inspect-db does not load OpenCV/NumPy
+_MODE_MODULES = {
+    "run_create_watched_db": ".create_watched_db",
+    "run_find_similar": ".find_similar",
+    "run_inspect_db": ".inspect_db",
+}
 
 __all__ = [
     "run_create_watched_db",
     "run_find_similar",
     "run_inspect_db",
 ]
+
+
+def __getattr__(name):
+    if name in _MODE_MODULES:
+        module = importlib.import_module(_MODE_MODULES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
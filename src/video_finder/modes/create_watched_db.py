@@ -2,7 +2,7 @@ import logging
 import os
 import sys
 
-from .. import config, core, utils, watched_db_manager
+from .. import cache_manager, config, core, hashing, utils, watched_db_manager
 
 
 def run_create_watched_db(args):
@@ -22,18 +22,19 @@ def run_create_watched_db(args):
             abs_source_directory, config.DEFAULT_WATCHED_DB_FILENAME
         )
     abs_db_path_to_use = os.path.abspath(db_path_to_use)
+    cache_path = cache_manager.get_cache_path(abs_source_directory, args.cache_file)
 
     utils.display_settings(
         args,
         "Create Watched Database",
         abs_source_directory,
         db_path=abs_db_path_to_use,
-        cache_dir=abs_source_directory,
+        cache_path=cache_path,
     )
 
     try:
         # Calculate hashes for all videos in the source directory
-        all_video_hashes = core.calculate_all_hashes(
+        all_video_hashes, _ = core.calculate_all_hashes(
             directory=abs_source_directory,
             recursive=args.recursive,
             cache_filename=args.cache_file,
@@ -41,6 +42,7 @@ def run_create_watched_db(args):
             hash_size=args.hash_size,
             skip_duration=args.skip_duration,
             max_workers=args.workers,
+            cache_path=cache_path,
         )
 
         if not all_video_hashes:
@@ -52,30 +54,28 @@ def run_create_watched_db(args):
         )
         print(f"Adding/updating entries in watched database: {abs_db_path_to_use}")
 
-        processed_count = 0
-        total_videos = len(all_video_hashes)
+        videos_to_add = {}
         for video_path, hashes_list in all_video_hashes.items():
-            processed_count += 1
-            if not hashes_list:
+            if hashes_list is None or len(hashes_list) == 0:
                 logging.warning(
                     f"No hashes generated for video '{video_path}', skipping database entry."
                 )
                 continue
 
-            video_hashes_set_str = {str(h) for h in hashes_list}
-
-            watched_db_manager.add_video_to_watched_db(
-                db_path=abs_db_path_to_use,
-                video_identifier=video_path,
-                video_hashes_set=video_hashes_set_str,
-                num_frames=args.frames,
-                hash_size=args.hash_size,
+            videos_to_add[video_path] = set(
+                hashing.hashes_to_hex(hashes_list, args.hash_size)
             )
 
-            if processed_count % 50 == 0 or processed_count == total_videos:
-                logging.info(
-                    f"Processed {processed_count}/{total_videos} videos for watched database."
-                )
+        # One shelve write for all videos instead of one per video
+        written_count = watched_db_manager.add_videos_to_watched_db(
+            db_path=abs_db_path_to_use,
+            videos_hashes=videos_to_add,
+            num_frames=args.frames,
+            hash_size=args.hash_size,
+        )
+        logging.info(
+            f"Processed {written_count}/{len(all_video_hashes)} videos for watched database."
+        )
 
         print("Watched database creation/update complete.")
 
@@ -2,7 +2,16 @@ import logging
 import os
 import sys
 
-from .. import config, core, utils, watched_db_manager
+from .. import cache_manager, config, core, hashing, utils, watched_db_manager
+
+
+def _confirm(args, prompt_msg):
+    """Asks `prompt_msg`, unless --assume-yes/--assume-no already answered it."""
+    if args.assume_yes or args.assume_no:
+        answer = "y" if args.assume_yes else "n"
+        print(f"{prompt_msg}{answer}")
+        return answer
+    return input(prompt_msg)
 
 
 def _handle_watched_videos(args, all_video_hashes, abs_target_directory):
@@ -43,7 +52,7 @@ def _handle_watched_videos(args, all_video_hashes, abs_target_directory):
                 f" (DB: frames={db_frames}, hash_size={db_hash_size} | "
                 f"Current: frames={args.frames}, hash_size={args.hash_size}) [y/N]: "
             )
-            confirm_use_db_params = input(prompt_msg)
+            confirm_use_db_params = _confirm(args, prompt_msg)
             if confirm_use_db_params.lower() == "y":
                 print(
                     f"Proceeding with watched database parameters: frames={db_frames}, hash_size={db_hash_size}"
@@ -61,12 +70,24 @@ def _handle_watched_videos(args, all_video_hashes, abs_target_directory):
                 sys.exit(1)
         else:
             logging.info("Watched DB parameters match current run parameters.")
+
+        db_hash_version = db_metadata.get("hash_version")
+        if db_hash_version != config.HASH_VERSION:
+            warn_msg = (
+                f"Warning: Watched DB hashes were built with hash version {db_hash_version}, "
+                f"current version is {config.HASH_VERSION}. Watched videos are only matched "
+                "approximately and may be missed at high thresholds. Rebuild the DB with "
+                "--create-watched-db-from to refresh its hashes."
+            )
+            logging.warning(warn_msg)
+            print(warn_msg)
     elif watched_videos_data:
         warn_msg = "Warning: Could not find hashing parameters (metadata) in the watched DB. Parameter consistency cannot be guaranteed. Ensure current settings match DB creation settings."
         logging.warning(warn_msg)
         print(warn_msg)
 
-    videos_to_check_for_duplicates = all_video_hashes.copy()
+    # Never mutated below, so the hash map is shared instead of copied
+    videos_to_check_for_duplicates = all_video_hashes
     watched_videos_found = []
     moved_watched_files_set = set()
 
@@ -92,8 +113,9 @@ def _handle_watched_videos(args, all_video_hashes, abs_target_directory):
         print(
             f"Found {len(watched_videos_found)} video(s) matching the watched database."
         )
-        confirm_watched = input(
-            f"Proceed with moving these watched videos to '{config.DEFAULT_WATCHED_DIR_NAME}' subdirectory? [y/N]: "
+        confirm_watched = _confirm(
+            args,
+            f"Proceed with moving these watched videos to '{config.DEFAULT_WATCHED_DIR_NAME}' subdirectory? [y/N]: ",
         )
         if confirm_watched.lower() == "y":
             print("Moving watched videos...")
@@ -127,32 +149,40 @@ def _handle_duplicate_videos(args, videos_to_check, abs_target_directory):
                - set: paths of files *intended* to be moved as duplicates (based on user confirmation)
     """
     print("-" * 30)
-    print(
-        f"Checking for duplicates among the remaining {len(videos_to_check)} videos..."
-    )
-    similar_video_groups = []
     moved_duplicate_files_set = set()
 
-    if len(videos_to_check) >= 2:
-        similar_video_groups = core.find_similar_groups(
-            video_hashes_map=videos_to_check,
-            hash_size=args.hash_size,
-            similarity_threshold=args.threshold,
-        )
-    else:
+    # Nothing can pair up, so skip the search and the (empty) results listing
+    if len(videos_to_check) < 2:
         print("Less than two videos remaining, skipping duplicate check.")
+        print("-" * 30)
+        return [], moved_duplicate_files_set
+
+    print(
+        f"Checking for duplicates among the remaining {len(videos_to_check)} videos..."
+    )
+    similar_video_groups = core.find_similar_groups(
+        video_hashes_map=videos_to_check,
+        hash_size=args.hash_size,
+        similarity_threshold=args.threshold,
+    )
 
     utils.print_similar_video_groups(similar_video_groups)
 
     if similar_video_groups:
-        num_duplicates_to_move = sum(len(group) for group, _ in similar_video_groups)
+        # Every file in a group is moved; groups are disjoint, so one pass
+        # collects all members and their count
+        duplicate_files = set()
+        for group_set, _ in similar_video_groups:
+            duplicate_files |= group_set
+        num_duplicates_to_move = len(duplicate_files)
         if num_duplicates_to_move > 0:
             print("-" * 30)
             print(
                 f"Found {num_duplicates_to_move} file(s) across {len(similar_video_groups)} duplicate groups."
             )
-            confirm_duplicates = input(
-                f"Proceed with moving ALL files in these groups to '{config.DEFAULT_DUPLICATE_DIR_NAME}' subdirectory? [Y/n]: "
+            confirm_duplicates = _confirm(
+                args,
+                f"Proceed with moving ALL files in these groups to '{config.DEFAULT_DUPLICATE_DIR_NAME}' subdirectory? [Y/n]: ",
             )
             if confirm_duplicates.lower() != "n":
                 print("Moving duplicates...")
@@ -164,8 +194,7 @@ def _handle_duplicate_videos(args, videos_to_check, abs_target_directory):
                 print(
                     f"Finished moving duplicates: {moved_count} file(s) moved, {failed_count} failed."
                 )
-                for group_set, _ in similar_video_groups:
-                    moved_duplicate_files_set.update(group_set)
+                moved_duplicate_files_set = duplicate_files
             else:
                 print("Move operation for duplicates cancelled by user.")
     print("-" * 30)
@@ -189,8 +218,9 @@ def _handle_skipped_videos(args, skipped_during_hashing, abs_target_directory):
     print(
         f"Found {len(skipped_during_hashing)} video(s) that were skipped during hashing (e.g., too short, corrupted)."
     )
-    confirm_skipped = input(
-        f"Proceed with moving these skipped videos to '{config.DEFAULT_SKIPPED_DIR_NAME}' subdirectory? [Y/n]: "
+    confirm_skipped = _confirm(
+        args,
+        f"Proceed with moving these skipped videos to '{config.DEFAULT_SKIPPED_DIR_NAME}' subdirectory? [Y/n]: ",
     )
     if confirm_skipped.lower() != "n":
         print("Moving skipped videos...")
@@ -224,9 +254,10 @@ def _update_watched_database(
     print("-" * 30)
     print(f"Updating watched database: {args.watched_db}")
 
-    final_unique_paths = set(videos_to_check.keys())
-    final_unique_paths -= moved_watched_files
-    final_unique_paths -= moved_duplicate_files
+    # dict_keys supports set difference directly, no intermediate set(keys) copy
+    final_unique_paths = (
+        videos_to_check.keys() - moved_watched_files - moved_duplicate_files
+    )
 
     if not final_unique_paths:
         print("No new unique, unwatched videos found to add to the watched database.")
@@ -234,20 +265,15 @@ def _update_watched_database(
         print(f"Found {len(final_unique_paths)} unique, unwatched video(s) to add.")
         print("Adding/updating entries in the watched database...")
 
-        added_count = 0
+        videos_to_add = {}
         for video_path in final_unique_paths:
             hashes_list = videos_to_check.get(video_path)
-            if hashes_list:
-                video_hashes_set_str = {str(h) for h in hashes_list}
+            if hashes_list is not None and len(hashes_list) > 0:
+                video_hashes_set_str = set(
+                    hashing.hashes_to_hex(hashes_list, args.hash_size)
+                )
                 if video_hashes_set_str:
-                    watched_db_manager.add_video_to_watched_db(
-                        db_path=args.watched_db,
-                        video_identifier=video_path,
-                        video_hashes_set=video_hashes_set_str,
-                        num_frames=args.frames,
-                        hash_size=args.hash_size,
-                    )
-                    added_count += 1
+                    videos_to_add[video_path] = video_hashes_set_str
                 else:
                     logging.warning(
                         f"Hash list for video '{video_path}' resulted in an empty string set. Not adding to DB."
@@ -257,6 +283,13 @@ def _update_watched_database(
                     f"Could not find hashes for final unique video intended for DB update: {video_path}"
                 )
 
+        # One shelve write for all videos instead of one per video
+        added_count = watched_db_manager.add_videos_to_watched_db(
+            db_path=args.watched_db,
+            videos_hashes=videos_to_add,
+            num_frames=args.frames,
+            hash_size=args.hash_size,
+        )
         print(
             f"Finished updating watched database. Added/updated {added_count} video entries."
         )
@@ -273,11 +306,13 @@ def run_find_similar(args):
         logging.error(f"Error: Directory not found: {abs_target_directory}")
         sys.exit(1)
 
+    # Resolved once and shared by the settings display and the hashing step
+    cache_path = cache_manager.get_cache_path(abs_target_directory, args.cache_file)
     utils.display_settings(
         args,
         "Find Similar/Watched Videos",
         abs_target_directory,
-        cache_dir=abs_target_directory,
+        cache_path=cache_path,
     )
 
     try:
@@ -289,6 +324,7 @@ def run_find_similar(args):
             hash_size=args.hash_size,
             skip_duration=args.skip_duration,
             max_workers=args.workers,
+            cache_path=cache_path,
         )
 
         if not all_video_hashes:
@@ -304,7 +340,7 @@ def run_find_similar(args):
                 _handle_watched_videos(args, all_video_hashes, abs_target_directory)
             )
         else:
-            videos_to_check_for_duplicates = all_video_hashes.copy()
+            videos_to_check_for_duplicates = all_video_hashes
             moved_watched_files = set()
 
         moved_duplicate_files = set()
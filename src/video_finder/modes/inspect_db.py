@@ -29,6 +29,7 @@ def run_inspect_db(args):
                 f"  - Frames sampled per video: {db_metadata.get('num_frames', 'N/A')}"
             )
             print(f"  - Hash size: {db_metadata.get('hash_size', 'N/A')}")
+            print(f"  - Hash version: {db_metadata.get('hash_version', 'N/A')}")
         else:
             print(
                 "Hashing parameter metadata not found or database could not be loaded."
@@ -1,3 +1,4 @@
+from .find_candidate_pairs import find_candidate_pairs
 from .get_video_files import get_video_files
 from .group_similar_items import group_similar_items
 from .human_readable_size import human_readable_size
@@ -8,6 +9,7 @@ from .display_settings import display_settings
 from .move_skipped_files import move_skipped_files
 
 __all__ = [
+    "find_candidate_pairs",
     "get_video_files",
     "group_similar_items",
     "human_readable_size",
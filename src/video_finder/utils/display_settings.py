@@ -1,39 +1,45 @@
 import os
 
+from .. import config
 
-def display_settings(args, mode_name, primary_directory, db_path=None, cache_dir=None):
+
+def display_settings(args, mode_name, primary_directory, db_path=None, cache_path=None):
     """Prints the common settings block for different modes."""
-    if cache_dir is None:
-        cache_dir = primary_directory
+    if cache_path is None:
+        cache_path = os.path.join(primary_directory, args.cache_file)
 
-    print("-" * 30)
-    print(f"Mode: {mode_name}")
-    print(f"Scanning directory: '{primary_directory}'")
-    print(f"Frames sampled per video: {args.frames}")
-    print(f"Hash size: {args.hash_size}x{args.hash_size}")
-    print(f"Skip duration: {args.skip_duration} seconds")
+    # Collected first and written with a single print call
+    lines = [
+        "-" * 30,
+        f"Mode: {mode_name}",
+        f"Scanning directory: '{primary_directory}'",
+        f"Frames sampled per video: {args.frames}",
+        f"Hash size: {args.hash_size}x{args.hash_size}",
+        f"Skip duration: {args.skip_duration} seconds",
+    ]
 
-    cache_path_display = os.path.join(cache_dir, args.cache_file + ".db")
+    cache_path_display = cache_path + config.CACHE_FILE_EXTENSION
     try:
         # Display relative path for readability, fallback to absolute if needed
         rel_cache_path = os.path.relpath(cache_path_display)
-        print(f"Using cache file: ~{rel_cache_path}")
+        lines.append(f"Using cache file: ~{rel_cache_path}")
     except ValueError:
-        print(f"Using cache file: {cache_path_display}")
+        lines.append(f"Using cache file: {cache_path_display}")
 
-    print(f"Max workers: {args.workers}")
-    print(f"Recursive scan: {'Enabled' if args.recursive else 'Disabled'}")
+    lines.append(f"Max workers: {args.workers}")
+    lines.append(f"Recursive scan: {'Enabled' if args.recursive else 'Disabled'}")
 
     # Show mode-specific settings
     if "Find Similar" in mode_name:
-        print(f"Similarity threshold: {args.threshold}%")
+        lines.append(f"Similarity threshold: {args.threshold}%")
         if args.watched_db:
-            print(f"Using watched database: {args.watched_db}")
-            print(
+            lines.append(f"Using watched database: {args.watched_db}")
+            lines.append(
                 "Watched database will be updated with unique, unwatched videos found."
             )
     elif "Create Watched" in mode_name:
         if db_path:
-            print(f"Creating/updating watched database: {db_path}")
+            lines.append(f"Creating/updating watched database: {db_path}")
 
-    print("-" * 30)
+    lines.append("-" * 30)
+    print("\n".join(lines))
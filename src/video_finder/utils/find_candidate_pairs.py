@@ -0,0 +1,86 @@
+import logging
+import math
+
+import numpy as np
+
+from .. import config
+
+
+def find_candidate_pairs(hash_matrix, max_distance):
+    """
+    Finds pairs of rows that can be within `max_distance` bits of each other by
+    bucketing rows on 16-bit bands of their packed hashes (banding LSH).
+
+    A bit difference changes at most one band, so a pair with distance <= `max_distance`
+    shares at least `num_bands - max_distance` identical bands. Pairs sharing fewer
+    bands are pruned without computing their distance, and no true match is lost.
+
+    Every 64 hash bits give 4 bands, so the bound only exists while `max_distance` is
+    below a sixteenth of the total bit count, i.e. for similarity thresholds above
+    93.75% (hash sizes that fill whole 64-bit words). At the default 90% threshold
+    the caller always falls back to the blocked full scan.
+
+    Args:
+        hash_matrix (np.ndarray): uint64 array of shape (num_rows, hash_words_total).
+        max_distance (int): Largest total Hamming distance a pair may have.
+
+    Returns:
+        list | None: Sorted list of `(row1, row2)` candidate pairs with row1 < row2,
+                     or None if banding cannot prune anything for this threshold
+                     or the shared buckets hold more than
+                     `config.CANDIDATE_PAIRS_PER_ROW` pairs per row.
+    """
+    num_rows = hash_matrix.shape[0]
+    bands = np.ascontiguousarray(hash_matrix).view(np.uint16)
+    num_bands = bands.shape[1]
+    min_shared_bands = num_bands - max_distance
+    if min_shared_bands <= 0:
+        logging.info(
+            f"Band filter skipped: {num_bands} bands cannot bound distance {max_distance} "
+            "at this threshold; comparing all pairs."
+        )
+        return None
+
+    # Group rows by value within every band column. Shared frames (black intros,
+    # title cards) put many rows in one bucket, so the pair count is checked
+    # against a budget before any pair is built
+    buckets = []
+    bucket_pairs = 0
+    max_bucket_pairs = config.CANDIDATE_PAIRS_PER_ROW * num_rows
+    for band_idx in range(num_bands):
+        _, inverse, counts = np.unique(
+            bands[:, band_idx], return_inverse=True, return_counts=True
+        )
+        # Most band values are unique to one row; split only the shared buckets
+        shared_rows = np.flatnonzero(counts[inverse] > 1)
+        if not len(shared_rows):
+            continue
+        shared_counts = counts[counts > 1]
+        bucket_pairs += int((shared_counts * (shared_counts - 1) // 2).sum())
+        if bucket_pairs > max_bucket_pairs:
+            logging.info(
+                "Band filter skipped: buckets too dense to prune; comparing all pairs."
+            )
+            return None
+        order = shared_rows[np.argsort(inverse[shared_rows], kind="stable")]
+        buckets.extend(np.split(order, np.cumsum(shared_counts)[:-1]))
+
+    # Encode each pair as row1 * num_rows + row2 and count the bands it shares
+    pair_ids = [np.empty(0, dtype=np.int64)]
+    pair_indices = {}
+    for members in buckets:
+        size = len(members)
+        if size not in pair_indices:
+            pair_indices[size] = np.triu_indices(size, k=1)
+        first, second = pair_indices[size]
+        # Members are in ascending row order, so first < second keeps row1 < row2
+        pair_ids.append(members[first].astype(np.int64) * num_rows + members[second])
+    unique_ids, shared_bands = np.unique(np.concatenate(pair_ids), return_counts=True)
+    kept_ids = unique_ids[shared_bands >= min_shared_bands]
+    candidates = list(
+        zip((kept_ids // num_rows).tolist(), (kept_ids % num_rows).tolist())
+    )
+    logging.info(
+        f"Band filter kept {len(candidates)} of {math.comb(num_rows, 2)} pairs as candidates."
+    )
+    return candidates
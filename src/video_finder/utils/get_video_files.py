@@ -6,7 +6,8 @@ from .. import config
 
 def get_video_files(directory, recursive=False):
     """
-    Finds video files in a directory.
+    Finds video files in a directory and records their modification times
+    from the same `os.scandir` pass.
 
     Args:
         directory (str): The path to the directory to scan.
@@ -14,50 +15,49 @@ def get_video_files(directory, recursive=False):
                           duplicate directory. If False, scans only the top-level directory.
 
     Returns:
-        list: A list of absolute paths to found video files.
+        dict: {absolute video path: mtime}, with mtime as `os.path.getmtime` reports it.
     """
-    video_files = []
-    duplicate_dir_name = config.DEFAULT_DUPLICATE_DIR_NAME
-    watched_dir_name = config.DEFAULT_WATCHED_DIR_NAME
-    skipped_dir_name = config.DEFAULT_SKIPPED_DIR_NAME
-    try:
-        if recursive:
-            logging.debug(f"Recursively scanning {directory}...")
-            # Prevent descending into the duplicate directory
-            for root, dirnames, files in os.walk(directory, topdown=True):
-                if duplicate_dir_name in dirnames:
-                    logging.debug(
-                        f"Skipping duplicate directory: {os.path.join(root, duplicate_dir_name)}"
-                    )
-                    dirnames.remove(duplicate_dir_name)
-                if watched_dir_name in dirnames:
-                    logging.debug(
-                        f"Skipping watched directory: {os.path.join(root, watched_dir_name)}"
-                    )
-                    dirnames.remove(watched_dir_name)
-                if skipped_dir_name in dirnames:
-                    logging.debug(
-                        f"Skipping skipped directory: {os.path.join(root, skipped_dir_name)}"
-                    )
-                    dirnames.remove(skipped_dir_name)
-                for file in files:
-                    if os.path.splitext(file)[1].lower() in config.VIDEO_EXTENSIONS:
-                        video_files.append(os.path.abspath(os.path.join(root, file)))
-        else:
-            logging.debug(f"Scanning non-recursively: {directory}...")
-            for item in os.listdir(directory):
-                item_path = os.path.join(directory, item)
-                if (
-                    os.path.isfile(item_path)
-                    and os.path.splitext(item)[1].lower() in config.VIDEO_EXTENSIONS
-                ):
-                    video_files.append(os.path.abspath(item_path))
-
-    except FileNotFoundError:
-        logging.error(f"Directory not found: {directory}")
-    except PermissionError:
-        logging.error(f"Permission denied accessing directory: {directory}")
-    except Exception as e:
-        logging.error(f"Error scanning directory {directory}: {e}")
+    video_files = {}
+    excluded_dir_names = {
+        config.DEFAULT_DUPLICATE_DIR_NAME,
+        config.DEFAULT_WATCHED_DIR_NAME,
+        config.DEFAULT_SKIPPED_DIR_NAME,
+    }
+    if recursive:
+        logging.debug(f"Recursively scanning {directory}...")
+    else:
+        logging.debug(f"Scanning non-recursively: {directory}...")
+
+    pending_dirs = [os.path.abspath(directory)]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not recursive:
+                            continue
+                        # Prevent descending into the duplicate/watched/skipped directories
+                        if entry.name in excluded_dir_names:
+                            logging.debug(f"Skipping directory: {entry.path}")
+                            continue
+                        pending_dirs.append(entry.path)
+                    elif (
+                        entry.name.lower().endswith(config.VIDEO_EXTENSIONS_TUPLE)
+                        and entry.is_file()
+                    ):
+                        # A file that vanishes or cannot be read mid-scan is skipped
+                        # without abandoning the rest of its directory
+                        try:
+                            video_files[entry.path] = entry.stat().st_mtime
+                        except OSError as e:
+                            logging.warning(f"Could not read file {entry.path}: {e}")
+
+        except FileNotFoundError:
+            logging.error(f"Directory not found: {current_dir}")
+        except PermissionError:
+            logging.error(f"Permission denied accessing directory: {current_dir}")
+        except Exception as e:
+            logging.error(f"Error scanning directory {current_dir}: {e}")
 
     return video_files
@@ -1,6 +1,8 @@
-import itertools
 import logging
-from collections import defaultdict
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 
 
 def group_similar_items(item_pairs_with_similarity):
@@ -21,54 +23,38 @@ def group_similar_items(item_pairs_with_similarity):
         return []
 
     logging.info("Grouping similar items and calculating average similarity...")
-    adj = defaultdict(list)
-    all_items = set()
+    item_indices = {}
     pair_similarities = {}
     for u, v, similarity in item_pairs_with_similarity:
-        adj[u].append(v)
-        adj[v].append(u)
-        all_items.add(u)
-        all_items.add(v)
-        pair_key = tuple(sorted((u, v)))
-        pair_similarities[pair_key] = similarity
-
-    groups_with_similarity = []
-    visited = set()
-
-    for item in all_items:
-        if item not in visited:
-            current_group = set()
-            q = [item]
-            visited.add(item)
-            while q:
-                curr = q.pop(0)
-                current_group.add(curr)
-                for neighbor in adj[curr]:
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        q.append(neighbor)
-
-            if len(current_group) > 1:
-                group_similarity_sum = 0.0
-                group_pair_count = 0
-                # Calculate average similarity for all unique pairs in the group
-                for item_a, item_b in itertools.combinations(current_group, 2):
-                    pair_key = tuple(sorted((item_a, item_b)))
-                    if pair_key in pair_similarities:
-                        group_similarity_sum += pair_similarities[pair_key]
-                        group_pair_count += 1
-
-                average_similarity = (
-                    group_similarity_sum / group_pair_count
-                    if group_pair_count > 0
-                    else 0.0
-                )
-                if group_pair_count == 0:
-                    logging.warning(
-                        f"Group {current_group} has no internal pairs meeting threshold? Assigning 0 similarity."
-                    )
-
-                groups_with_similarity.append((current_group, average_similarity))
+        index_u = item_indices.setdefault(u, len(item_indices))
+        index_v = item_indices.setdefault(v, len(item_indices))
+        pair_similarities[(min(index_u, index_v), max(index_u, index_v))] = similarity
+
+    items = list(item_indices)
+    rows, cols = np.array(list(pair_similarities), dtype=np.int64).T
+    similarities = np.fromiter(pair_similarities.values(), dtype=np.float64)
+
+    graph = coo_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+        shape=(len(items), len(items)),
+    )
+    num_groups, labels = connected_components(graph, directed=False)
+
+    # Every pair lies inside exactly one group, so average per group label
+    pair_labels = labels[rows]
+    similarity_sums = np.bincount(
+        pair_labels, weights=similarities, minlength=num_groups
+    )
+    pair_counts = np.bincount(pair_labels, minlength=num_groups)
+
+    group_members = [set() for _ in range(num_groups)]
+    for item, label in zip(items, labels.tolist()):
+        group_members[label].add(item)
+
+    groups_with_similarity = [
+        (group_members[label], float(similarity_sums[label] / pair_counts[label]))
+        for label in range(num_groups)
+    ]
 
     logging.info(f"Found {len(groups_with_similarity)} groups of similar items.")
     return groups_with_similarity
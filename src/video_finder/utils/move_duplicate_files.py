@@ -30,7 +30,8 @@ def move_duplicate_files(
     except OSError as e:
         logging.error(f"Failed to create directory {duplicate_dir_path}: {e}")
         print(f"Error: Could not create directory {duplicate_dir_path}. Aborting move.")
-        return 0, sum(len(g[0]) - 1 for g in groups if len(g[0]) > 1)
+        group_sizes = [len(g[0]) for g in groups if len(g[0]) > 1]
+        return 0, sum(group_sizes) - len(group_sizes)
 
     for group, avg_similarity in groups:
         if len(group) < 2:
@@ -3,6 +3,8 @@ import shelve
 import os
 from contextlib import closing
 
+from . import config
+
 _WATCHED_VIDEOS_DATA_KEY = (
     "watched_videos_data"  # Stores {video_identifier: {hash_set}}
 )
@@ -63,8 +65,9 @@ def load_watched_videos_data(db_path_arg):
     Returns:
         tuple: A tuple containing (watched_videos_dict, metadata_dict).
                - watched_videos_dict (dict): {video_identifier: {hash_set}}. Empty if none found.
-               - metadata_dict (dict | None): Dictionary with 'num_frames' and 'hash_size'
-                 if found, otherwise None.
+               - metadata_dict (dict | None): Dictionary with 'num_frames', 'hash_size'
+                 and 'hash_version' if found, otherwise None. Databases written
+                 before hashes were versioned report 'hash_version' 1.
     """
     watched_videos_data = {}
     metadata = None
@@ -96,6 +99,8 @@ def load_watched_videos_data(db_path_arg):
                     f"Data under key '{_METADATA_KEY}' in {actual_file_path} is not a dictionary. Ignoring metadata."
                 )
                 metadata = None
+            elif metadata is not None:
+                metadata.setdefault("hash_version", 1)
 
         log_msg = f"Loaded {len(watched_videos_data)} video entries"
         if metadata:
@@ -112,37 +117,37 @@ def load_watched_videos_data(db_path_arg):
     return watched_videos_data, metadata
 
 
-def add_video_to_watched_db(
-    db_path, video_identifier, video_hashes_set, num_frames, hash_size
-):
+def add_videos_to_watched_db(db_path, videos_hashes, num_frames, hash_size):
     """
-    Adds or updates a single video's entry (identifier and hash set) and associated
-    metadata in the watched video database.
+    Adds or updates many videos' entries and the associated metadata in the watched
+    video database. The shelve is opened and its video dictionary rewritten once
+    for the whole batch instead of once per video.
 
     Args:
         db_path (str): Path to the watched database file (base path, without extension).
-        video_identifier (str): A unique identifier for the video (e.g., absolute path).
-        video_hashes_set (set): A set of hash strings for this specific video.
+        videos_hashes (dict): {video_identifier: set of hash strings}.
         num_frames (int): The number of frames used to generate these hashes.
         hash_size (int): The hash size used to generate these hashes.
+
+    Returns:
+        int: Number of video entries written (0 if the update failed).
     """
-    if not video_identifier:
-        logging.error("Internal error: video_identifier must be provided.")
-        return
-    if not isinstance(video_hashes_set, set):
-        logging.error("Internal error: video_hashes_set must be provided as a set.")
-        return
+    if not all(isinstance(hashes, set) for hashes in videos_hashes.values()):
+        logging.error("Internal error: video hashes must be provided as sets.")
+        return 0
     if num_frames is None or hash_size is None:
         logging.error(
             "Internal error: num_frames and hash_size must be provided to store metadata."
         )
-        return
+        return 0
+    if not videos_hashes:
+        return 0
 
     logging.info(
-        f"Attempting to add/update entry for video '{os.path.basename(video_identifier)}' in watched database (input path: {db_path})"
+        f"Attempting to add/update {len(videos_hashes)} entries in watched database (input path: {db_path})"
     )
-    video_added = False
-    video_updated = False
+    added_count = 0
+    updated_count = 0
 
     base_db_path, _ = _get_shelve_base_path_and_actual_file(db_path)
 
@@ -159,35 +164,48 @@ def add_video_to_watched_db(
                 )
                 current_videos_data = {}
 
-            hashes_to_store_str = {str(h) for h in video_hashes_set}
-
-            if video_identifier not in current_videos_data:
-                video_added = True
-            elif current_videos_data[video_identifier] != hashes_to_store_str:
-                video_updated = True
-
-            current_videos_data[video_identifier] = hashes_to_store_str
+            # Entries this batch does not rewrite keep the database flagged with
+            # their older hash version until they are rehashed too
+            hash_version = config.HASH_VERSION
+            if current_videos_data.keys() - videos_hashes.keys():
+                stored_metadata = db.get(_METADATA_KEY, None)
+                if isinstance(stored_metadata, dict):
+                    hash_version = min(
+                        hash_version, stored_metadata.get("hash_version", 1)
+                    )
+                else:
+                    hash_version = 1
+
+            for video_identifier, video_hashes_set in videos_hashes.items():
+                hashes_to_store_str = {str(h) for h in video_hashes_set}
+
+                if video_identifier not in current_videos_data:
+                    added_count += 1
+                elif current_videos_data[video_identifier] != hashes_to_store_str:
+                    updated_count += 1
+
+                current_videos_data[video_identifier] = hashes_to_store_str
             final_video_count = len(current_videos_data)
 
-            metadata_to_store = {"num_frames": num_frames, "hash_size": hash_size}
+            metadata_to_store = {
+                "num_frames": num_frames,
+                "hash_size": hash_size,
+                "hash_version": hash_version,
+            }
 
             db[_WATCHED_VIDEOS_DATA_KEY] = current_videos_data
             db[_METADATA_KEY] = metadata_to_store
 
-        if video_added:
-            action_str = "added new entry for"
-        elif video_updated:
-            action_str = "updated entry for"
-        else:
-            action_str = "refreshed entry for"
-
+        refreshed_count = len(videos_hashes) - added_count - updated_count
         logging.info(
-            f"Successfully {action_str} video '{os.path.basename(video_identifier)}' ({len(hashes_to_store_str)} hashes) "
+            f"Successfully added {added_count}, updated {updated_count} and refreshed {refreshed_count} video entries "
             f"and updated metadata (frames={num_frames}, hash_size={hash_size}) in shelve (base path: {base_db_path}). "
             f"Total watched videos: {final_video_count}."
         )
+        return len(videos_hashes)
 
     except Exception as e:
         logging.error(
-            f"Error updating watched database (base path '{base_db_path}') for video '{video_identifier}': {e}"
+            f"Error updating watched database (base path '{base_db_path}') with {len(videos_hashes)} videos: {e}"
         )
+        return 0